@@ -5,14 +5,46 @@ This module provides singleton access to embedding models and functions
 to generate embeddings for text and images using sentence-transformers.
 """
 
-from typing import List, Union, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Union, Optional
+import os
 from PIL import Image
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import logging
 
+# torch and sentence-transformers are imported when a model is first loaded,
+# so importing this module (e.g. via app.retrieval) stays cheap
+if TYPE_CHECKING:
+	from sentence_transformers import SentenceTransformer
+
 logger = logging.getLogger(__name__)
 
+# Device override for both models; unset means CUDA when available, else CPU
+RAG_DEVICE = os.getenv("RAG_DEVICE")
+
+# Inference backend for the text model: "torch", "onnx" or "openvino".
+# CLIP always runs on torch (sentence-transformers has no ONNX path for it).
+TEXT_MODEL_BACKEND = os.getenv("TEXT_EMBEDDING_BACKEND", "torch")
+# Optional model file within the hub repo, e.g. "onnx/model_qint8_avx512_vnni.onnx"
+TEXT_MODEL_FILE = os.getenv("TEXT_EMBEDDING_MODEL_FILE")
+
+# CLIP resizes inputs to 224px; images larger than twice that are box-reduced first
+CLIP_MAX_SIDE = 448
+
+
+@lru_cache(maxsize=None)
+def _device() -> str:
+	"""
+	Resolve the device the embedding models run on.
+	
+	Returns:
+		str: RAG_DEVICE if set, otherwise "cuda" when available, else "cpu"
+	"""
+	if RAG_DEVICE:
+		return RAG_DEVICE
+	import torch
+	return "cuda" if torch.cuda.is_available() else "cpu"
+
 
 class EmbeddingModels:
 	"""
@@ -21,11 +53,11 @@ class EmbeddingModels:
 	Maintains lazy-loaded instances of text and CLIP models to avoid
 	redundant model loading and reduce memory footprint.
 	"""
-	_text_model: Optional[SentenceTransformer] = None
-	_clip_model: Optional[SentenceTransformer] = None
+	_text_model: Optional["SentenceTransformer"] = None
+	_clip_model: Optional["SentenceTransformer"] = None
 
 	@classmethod
-	def get_text_model(cls) -> SentenceTransformer:
+	def get_text_model(cls) -> "SentenceTransformer":
 		"""
 		Get or initialize the text embedding model.
 		
@@ -33,12 +65,18 @@ class EmbeddingModels:
 			SentenceTransformer: all-MiniLM-L6-v2 model for text embeddings
 		"""
 		if cls._text_model is None:
-			logger.info("Loading text embedding model: all-MiniLM-L6-v2")
-			cls._text_model = SentenceTransformer("all-MiniLM-L6-v2")
+			from sentence_transformers import SentenceTransformer
+			device = _device()
+			logger.info(f"Loading text embedding model: all-MiniLM-L6-v2 (backend={TEXT_MODEL_BACKEND}, device={device})")
+			model_kwargs = {"file_name": TEXT_MODEL_FILE} if TEXT_MODEL_FILE else None
+			cls._text_model = SentenceTransformer(
+				"all-MiniLM-L6-v2", device=device, backend=TEXT_MODEL_BACKEND, model_kwargs=model_kwargs
+			)
+			cls._text_model.eval()
 		return cls._text_model
 
 	@classmethod
-	def get_clip_model(cls) -> SentenceTransformer:
+	def get_clip_model(cls) -> "SentenceTransformer":
 		"""
 		Get or initialize the CLIP model for multimodal embeddings.
 		
@@ -46,10 +84,45 @@ class EmbeddingModels:
 			SentenceTransformer: clip-ViT-B-32 model for text and image embeddings
 		"""
 		if cls._clip_model is None:
-			logger.info("Loading CLIP model: clip-ViT-B-32")
-			cls._clip_model = SentenceTransformer("clip-ViT-B-32")
+			from sentence_transformers import SentenceTransformer
+			device = _device()
+			logger.info(f"Loading CLIP model: clip-ViT-B-32 (device={device})")
+			cls._clip_model = SentenceTransformer("clip-ViT-B-32", device=device)
+			cls._clip_model.eval()
 		return cls._clip_model
 
+	@classmethod
+	def warm_up(cls) -> None:
+		"""
+		Load both models and run a dummy encode through each.
+		
+		Called at application startup so the first real request does not pay
+		for model loading or first-call kernel initialization.
+		"""
+		cls.get_text_model().encode(["warmup"], convert_to_numpy=True)
+		cls.get_clip_model().encode(["warmup"], convert_to_numpy=True)
+		logger.info("Embedding models loaded and warmed up")
+
+
+def _shrink_for_clip(image: Image.Image) -> Image.Image:
+	"""
+	Box-reduce a large image by an integer factor before CLIP preprocessing.
+	
+	Page renders are sized for OCR (often ~1700x2200), while CLIP only needs
+	224px. A cheap reduce() here avoids running the bicubic resize over the
+	full-resolution image.
+	
+	Args:
+		image: PIL Image object
+		
+	Returns:
+		Image.Image: Reduced image, or the original if already small enough
+	"""
+	factor = min(image.size) // CLIP_MAX_SIDE
+	if factor > 1:
+		return image.reduce(factor)
+	return image
+
 
 def embed_text(texts: List[str]) -> np.ndarray:
 	"""
@@ -63,6 +136,8 @@ def embed_text(texts: List[str]) -> np.ndarray:
 	"""
 	model = EmbeddingModels.get_text_model()
 	logger.debug(f"Generating text embeddings for {len(texts)} texts")
+	# encode() already length-sorts inputs before batching (minimizing padding)
+	# and restores the original order, so chunks are passed through as-is
 	embeddings = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
 	return embeddings
 
@@ -95,8 +170,31 @@ def embed_image(image: Union[Image.Image, str]) -> np.ndarray:
 	"""
 	model = EmbeddingModels.get_clip_model()
 	logger.debug(f"Generating image embedding")
+	if isinstance(image, Image.Image):
+		image = _shrink_for_clip(image)
 	# model.encode supports PIL Image directly for CLIP models
 	embeddings = model.encode([image], normalize_embeddings=True, convert_to_numpy=True)
 	return embeddings
 
 
+def embed_images_batch(images: List[Image.Image], batch_size: int = 32) -> np.ndarray:
+	"""
+	Generate CLIP embeddings for multiple images in batched forward passes.
+	
+	Args:
+		images: List of PIL Image objects
+		batch_size: Number of images per forward pass
+		
+	Returns:
+		np.ndarray: Normalized CLIP embeddings of shape (len(images), embedding_dim)
+	"""
+	model = EmbeddingModels.get_clip_model()
+	logger.debug(f"Generating image embeddings for {len(images)} images")
+	embeddings = model.encode(
+		[_shrink_for_clip(image) for image in images],
+		batch_size=batch_size,
+		normalize_embeddings=True,
+		convert_to_numpy=True,
+		show_progress_bar=False,
+	)
+	return embeddings
@@ -7,24 +7,99 @@ Extracts embeddings and stores them in ChromaDB with comprehensive metadata.
 
 import os
 import uuid
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, TypeVar
 import logging
 
 from fastapi import UploadFile, HTTPException
 from PIL import Image
 
-from app.embeddings import embed_text, embed_image
+from app.embeddings import embed_text, embed_image, embed_images_batch
 from app.storage import upsert_text, upsert_images
-from app.utils.ocr_utils import ocr_image
+from app.utils.ocr_utils import ocr_image, ocr_images
 from app.utils.pdf_utils import extract_pdf_text_per_page, extract_pdf_images
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 SUPPORTED_TEXT = {"text/plain"}
 SUPPORTED_IMAGES = {"image/png", "image/jpeg", "image/jpg"}
 SUPPORTED_PDF = {"application/pdf"}
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Text chunks embedded and upserted per batch
+TEXT_BATCH_SIZE = 256
+
+# Tesseract runs as a subprocess, so threads give real parallelism for OCR
+# (each worker OCRs its share of a page window in one Tesseract call)
+OCR_MAX_WORKERS = os.cpu_count() or 1
+# Number of rendered PDF pages held in memory at once
+PDF_PAGE_WINDOW = 32
+# Keep rendered PDF pages on disk under data/extracted (debugging only)
+SAVE_PDF_PAGES = os.getenv("SAVE_PDF_PAGES", "").lower() in ("1", "true", "yes")
+
+
+def _iter_paragraphs(text: str) -> Iterator[str]:
+	"""
+	Lazily split text into non-empty paragraphs on blank lines.
+	
+	Args:
+		text: Text to split
+		
+	Yields:
+		Stripped paragraph strings
+	"""
+	start = 0
+	while start <= len(text):
+		end = text.find("\n\n", start)
+		if end == -1:
+			end = len(text)
+		chunk = text[start:end].strip()
+		if chunk:
+			yield chunk
+		start = end + 2
+
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+	"""
+	Group an iterable into lists of at most size items.
+	
+	Args:
+		items: Items to group
+		size: Maximum batch size
+		
+	Yields:
+		Lists of consecutive items
+	"""
+	it = iter(items)
+	while batch := list(islice(it, size)):
+		yield batch
+
+
+def _upsert_text_chunks(records: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+	"""
+	Embed and store text chunks in batches of TEXT_BATCH_SIZE.
+	
+	Only one batch of chunks and embeddings is held in memory at a time.
+	
+	Args:
+		records: Tuples of (id, chunk text, metadata)
+		
+	Returns:
+		Number of chunks stored
+	"""
+	count = 0
+	for batch in _batched(records, TEXT_BATCH_SIZE):
+		ids = [record[0] for record in batch]
+		chunks = [record[1] for record in batch]
+		metas = [record[2] for record in batch]
+		upsert_text(ids=ids, embeddings=embed_text(chunks), metadatas=metas, documents=chunks)
+		count += len(batch)
+	return count
+
 
 async def process_upload(file: UploadFile) -> Dict[str, Any]:
 	"""
@@ -53,11 +128,13 @@ async def process_upload(file: UploadFile) -> Dict[str, Any]:
 	logger.info(f"Processing upload: {filename} (type: {content_type})")
 
 	try:
-		# Save file to disk
+		# Stream file to disk in fixed-size chunks to bound memory use
+		size = 0
 		with open(stored_path, "wb") as f:
-			content = await file.read()
-			f.write(content)
-		logger.debug(f"Saved file to {stored_path} ({len(content)} bytes)")
+			while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+				f.write(chunk)
+				size += len(chunk)
+		logger.debug(f"Saved file to {stored_path} ({size} bytes)")
 
 		if content_type in SUPPORTED_TEXT or filename.lower().endswith(".txt"):
 			return await _ingest_text(stored_path)
@@ -94,27 +171,26 @@ async def _ingest_text(path: str) -> Dict[str, Any]:
 		logger.warning(f"Empty text file: {path}")
 		raise HTTPException(status_code=400, detail="Empty text file")
 
-	# Simple chunking by paragraphs
-	chunks: List[str] = [c.strip() for c in text.split("\n\n") if c.strip()]
-	logger.debug(f"Split text into {len(chunks)} chunks")
-	
-	emb = embed_text(chunks)
 	doc_id = str(uuid.uuid4())
 	timestamp = datetime.utcnow().isoformat()
-	ids = [f"txt::{doc_id}::{i}" for i in range(len(chunks))]
-	metas = [
-		{
-			"doc_id": doc_id,
-			"file_type": "text",
-			"source_path": path,
-			"chunk_index": i,
-			"uploaded_at": timestamp,
-		}
-		for i in range(len(chunks))
-	]
-	upsert_text(ids=ids, embeddings=emb, metadatas=metas, documents=chunks)
-	logger.info(f"Successfully ingested text file with {len(chunks)} chunks, doc_id={doc_id}")
-	return {"status": "ok", "ingested_chunks": len(chunks), "doc_id": doc_id}
+	# Simple chunking by paragraphs, embedded and stored in bounded batches
+	records = (
+		(
+			f"txt::{doc_id}::{i}",
+			chunk,
+			{
+				"doc_id": doc_id,
+				"file_type": "text",
+				"source_path": path,
+				"chunk_index": i,
+				"uploaded_at": timestamp,
+			},
+		)
+		for i, chunk in enumerate(_iter_paragraphs(text))
+	)
+	num_chunks = _upsert_text_chunks(records)
+	logger.info(f"Successfully ingested text file with {num_chunks} chunks, doc_id={doc_id}")
+	return {"status": "ok", "ingested_chunks": num_chunks, "doc_id": doc_id}
 
 
 async def _ingest_image(path: str) -> Dict[str, Any]:
@@ -130,7 +206,9 @@ async def _ingest_image(path: str) -> Dict[str, Any]:
 	logger.info(f"Ingesting image file: {path}")
 	
 	try:
-		image = Image.open(path).convert("RGB")
+		image = Image.open(path)
+		if image.mode != "RGB":
+			image = image.convert("RGB")
 		image_emb = embed_image(image)
 		doc_id = str(uuid.uuid4())
 		timestamp = datetime.utcnow().isoformat()
@@ -175,66 +253,73 @@ async def _ingest_pdf(path: str) -> Dict[str, Any]:
 	try:
 		# Extract text per page
 		pages = extract_pdf_text_per_page(path)
-		text_chunks: List[str] = []
-		text_metas: List[Dict[str, Any]] = []
-		for page_num, page_text in pages:
-			if page_text:
-				# Paragraph split per page
-				chunks = [c.strip() for c in page_text.split("\n\n") if c.strip()]
-				for idx, chunk in enumerate(chunks):
-					text_chunks.append(chunk)
-					text_metas.append({
+		# Paragraph split per page
+		records = (
+			(
+				f"pdftext::{doc_id}::p{page_num}::c{idx}",
+				chunk,
+				{
+					"doc_id": doc_id,
+					"file_type": "pdf_text",
+					"source_path": path,
+					"uploaded_at": timestamp,
+					"page": page_num,
+					"chunk_index": idx,
+				},
+			)
+			for page_num, page_text in pages
+			for idx, chunk in enumerate(_iter_paragraphs(page_text))
+		)
+		num_text_chunks = _upsert_text_chunks(records)
+		logger.debug(f"Extracted {num_text_chunks} text chunks from PDF")
+
+		# Render pages and embed them in bounded windows to cap memory use
+		extract_dir = None
+		if SAVE_PDF_PAGES:
+			extract_dir = os.path.join("data/extracted", os.path.splitext(os.path.basename(path))[0])
+		page_iter = extract_pdf_images(path, extract_dir)
+		embedded_images = 0
+		
+		with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as ocr_pool:
+			for window in _batched(page_iter, PDF_PAGE_WINDOW):
+				window_images = [img for _, img, _ in window]
+
+				# One Tesseract process per group of pages, groups OCR'd in parallel
+				group_size = -(-len(window_images) // OCR_MAX_WORKERS)
+				ocr_futures = [
+					ocr_pool.submit(ocr_images, window_images[start:start + group_size])
+					for start in range(0, len(window_images), group_size)
+				]
+
+				# Single batched CLIP pass per window while OCR workers are still busy
+				arr = embed_images_batch(window_images)
+				ocr_texts = [text for future in ocr_futures for text in future.result()]
+
+				image_ids: List[str] = []
+				image_metas: List[Dict[str, Any]] = []
+				for (page_num, _, img_path), ocr_text in zip(window, ocr_texts):
+					meta = {
 						"doc_id": doc_id,
-						"file_type": "pdf_text",
+						"file_type": "pdf_image",
 						"source_path": path,
 						"uploaded_at": timestamp,
 						"page": page_num,
-						"chunk_index": idx,
-					})
-		logger.debug(f"Extracted {len(text_chunks)} text chunks from PDF")
-
-		# Extract embedded images (render pages)
-		extract_dir = os.path.join("data/extracted", os.path.splitext(os.path.basename(path))[0])
-		image_records = extract_pdf_images(path, extract_dir)
-		image_metas: List[Dict[str, Any]] = []
-		image_embeddings_list = []
-		image_ids: List[str] = []
-		
-		for rec in image_records:
-			img_path = rec["path"]
-			img = Image.open(img_path).convert("RGB")
-			ocr_text = ocr_image(img) or ""
-			emb = embed_image(img)
-			image_embeddings_list.append(emb[0])
-			image_ids.append(f"pdfimg::{doc_id}::p{rec['page']}::{os.path.basename(img_path)}")
-			image_metas.append({
-				"doc_id": doc_id,
-				"file_type": "pdf_image",
-				"source_path": path,
-				"uploaded_at": timestamp,
-				"page": rec["page"],
-				"image_path": img_path,
-				"ocr_text": ocr_text,
-			})
-		logger.debug(f"Rendered {len(image_embeddings_list)} page images from PDF")
-
-		# Upserts
-		if text_chunks:
-			text_emb = embed_text(text_chunks)
-			text_ids = [f"pdftext::{doc_id}::p{m['page']}::c{m['chunk_index']}" for m in text_metas]
-			upsert_text(ids=text_ids, embeddings=text_emb, metadatas=text_metas, documents=text_chunks)
-
-		if image_embeddings_list:
-			import numpy as np
-			arr = np.vstack(image_embeddings_list)
-			upsert_images(ids=image_ids, embeddings=arr, metadatas=image_metas)
-
-		logger.info(f"Successfully ingested PDF, doc_id={doc_id}, text_chunks={len(text_chunks)}, images={len(image_embeddings_list)}")
+						"ocr_text": ocr_text or "",
+					}
+					if img_path:
+						meta["image_path"] = img_path
+					image_ids.append(f"pdfimg::{doc_id}::p{page_num}")
+					image_metas.append(meta)
+				upsert_images(ids=image_ids, embeddings=arr, metadatas=image_metas)
+				embedded_images += len(window)
+		logger.debug(f"Rendered and embedded {embedded_images} page images from PDF")
+
+		logger.info(f"Successfully ingested PDF, doc_id={doc_id}, text_chunks={num_text_chunks}, images={embedded_images}")
 		return {
 			"status": "ok",
 			"doc_id": doc_id,
-			"text_chunks": len(text_chunks),
-			"embedded_images": len(image_embeddings_list),
+			"text_chunks": num_text_chunks,
+			"embedded_images": embedded_images,
 		}
 	except Exception as e:
 		logger.error(f"Error ingesting PDF {path}: {e}", exc_info=True)
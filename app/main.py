@@ -11,9 +11,12 @@ from pydantic import BaseModel
 from typing import List, Optional
 import os
 import logging
+import torch
 from datetime import datetime
 
+from app.embeddings import EmbeddingModels
 from app.ingestion import process_upload
+from app.storage import get_collections
 from app.retrieval import multimodal_query
 
 # Configure logging
@@ -27,6 +30,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default to roughly one thread per physical core; override with TORCH_NUM_THREADS
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", max(1, (os.cpu_count() or 2) // 2)))
+
 app = FastAPI(
 	title="Multimodal RAG System",
 	version="0.1.0",
@@ -48,6 +54,13 @@ async def on_startup() -> None:
 	for path in ["data/uploads", "data/extracted", "data/chroma", "logs"]:
 		os.makedirs(path, exist_ok=True)
 	logger.info("Data directories initialized")
+	torch.set_num_threads(TORCH_NUM_THREADS)
+	logger.info(f"PyTorch intra-op threads: {TORCH_NUM_THREADS}")
+	# Load models before traffic arrives so the first request is not slow
+	EmbeddingModels.warm_up()
+	# Open the shared Chroma client and collections once, before the first request
+	get_collections()
+	logger.info("Vector store initialized")
 
 
 @app.get("/health")
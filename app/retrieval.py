@@ -5,9 +5,11 @@ Implements cross-modal search by querying both text and image collections,
 normalizing scores, and merging results with proper source attribution.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Sequence
+import asyncio
 import math
 import logging
+import numpy as np
 from PIL import Image
 
 from app.embeddings import embed_text, embed_clip_text
@@ -16,29 +18,100 @@ from app.storage import query_text, query_images
 logger = logging.getLogger(__name__)
 
 
-def _normalize_scores(scores: List[float]) -> List[float]:
+def _normalize_scores(scores: Sequence[float]) -> List[float]:
 	"""
 	Normalize scores to [0, 1] range using min-max normalization.
 	
 	Args:
-		scores: List of raw similarity scores
+		scores: Raw similarity scores (list or numpy array)
 		
 	Returns:
 		List of normalized scores
 	"""
-	if not scores:
+	arr = np.asarray(scores, dtype=np.float64)
+	if arr.size == 0:
 		return []
-	mn = min(scores)
-	mx = max(scores)
+	mn = arr.min()
+	mx = arr.max()
 	if math.isclose(mx, mn):
-		return [1.0 for _ in scores]
-	return [(s - mn) / (mx - mn) for s in scores]
+		return [1.0] * arr.size
+	return ((arr - mn) / (mx - mn)).tolist()
+
+
+def _pad_scores(scores: List[float], n: int) -> List[float]:
+	"""
+	Align a score list with its result ids, filling missing scores with 0.0.
+	
+	Args:
+		scores: Normalized scores
+		n: Number of result ids
+		
+	Returns:
+		List of exactly n scores
+	"""
+	return (scores + [0.0] * n)[:n]
+
+
+def _select_top_k(text_scores: List[float], image_scores: List[float], top_k: int) -> np.ndarray:
+	"""
+	Select the indices of the top_k scores across both modalities.
+	
+	Indices below len(text_scores) refer to text results; the rest refer to
+	image results offset by len(text_scores). The sort is stable, so on ties
+	text results rank ahead of image results.
+	
+	Args:
+		text_scores: Normalized text result scores
+		image_scores: Normalized image result scores
+		top_k: Number of indices to return
+		
+	Returns:
+		np.ndarray: Combined indices ordered by descending score
+	"""
+	scores = np.asarray(text_scores + image_scores, dtype=np.float64)
+	return np.argsort(-scores, kind="stable")[:top_k]
+
+
+# Per-file_type formatters for the fixed metadata shapes written by ingestion;
+# output matches _format_generic_attribution for the same metadata
+_SOURCE_FORMATS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+	"text": lambda m: (
+		f"Source: {m['source_path']} | Type: text | Chunk: {m['chunk_index']} | Uploaded: {m['uploaded_at']}"
+	),
+	"pdf_text": lambda m: (
+		f"Source: {m['source_path']} | Type: pdf_text | Page: {m['page']}"
+		f" | Chunk: {m['chunk_index']} | Uploaded: {m['uploaded_at']}"
+	),
+	"image": lambda m: f"Source: {m['source_path']} | Type: image | Uploaded: {m['uploaded_at']}",
+	"pdf_image": lambda m: (
+		f"Source: {m['source_path']} | Type: pdf_image | Page: {m['page']} | Uploaded: {m['uploaded_at']}"
+	),
+}
 
 
 def _format_source_attribution(metadata: Dict[str, Any]) -> str:
 	"""
 	Format metadata into a human-readable source attribution string.
 	
+	Args:
+		metadata: Document metadata dictionary
+		
+	Returns:
+		Formatted source string
+	"""
+	formatter = _SOURCE_FORMATS.get(metadata.get("file_type"))
+	if formatter is not None:
+		try:
+			return formatter(metadata)
+		except KeyError:
+			pass
+	return _format_generic_attribution(metadata)
+
+
+def _format_generic_attribution(metadata: Dict[str, Any]) -> str:
+	"""
+	Format metadata of unknown or partial shape, including only the keys present.
+	
 	Args:
 		metadata: Document metadata dictionary
 		
@@ -60,11 +133,41 @@ def _format_source_attribution(metadata: Dict[str, Any]) -> str:
 	return " | ".join(parts)
 
 
+def _search_text(query: str, top_k: int) -> Dict[str, Any]:
+	"""
+	Embed a query with the text model and search the text collection.
+	
+	Args:
+		query: Natural language query string
+		top_k: Number of results to return
+		
+	Returns:
+		Raw Chroma query results for the text collection
+	"""
+	text_emb = embed_text([query])[0]
+	return query_text(text_emb, top_k=top_k)
+
+
+def _search_images(query: str, top_k: int) -> Dict[str, Any]:
+	"""
+	Embed a query with the CLIP text encoder and search the image collection.
+	
+	Args:
+		query: Natural language query string
+		top_k: Number of results to return
+		
+	Returns:
+		Raw Chroma query results for the image collection
+	"""
+	clip_text_emb = embed_clip_text([query])[0]
+	return query_images(clip_text_emb, top_k=top_k)
+
+
 async def multimodal_query(query: str, top_k: int = 5) -> Dict[str, Any]:
 	"""
 	Execute a multimodal query across text and image collections.
 	
-	This function performs dual retrieval:
+	This function performs dual retrieval concurrently:
 	1. Text search using text embeddings
 	2. Cross-modal search using CLIP text-to-image embeddings
 	
@@ -79,58 +182,56 @@ async def multimodal_query(query: str, top_k: int = 5) -> Dict[str, Any]:
 	"""
 	logger.info(f"Processing multimodal query: '{query}' with top_k={top_k}")
 	
-	# Text collection search
-	text_emb = embed_text([query])[0]
-	text_results = query_text(text_emb, top_k=top_k)
+	# Text search and CLIP cross-modal search use different models and
+	# collections, so run both branches concurrently in worker threads
+	loop = asyncio.get_running_loop()
+	text_results, image_results = await asyncio.gather(
+		loop.run_in_executor(None, _search_text, query, top_k),
+		loop.run_in_executor(None, _search_images, query, top_k),
+	)
 	logger.debug(f"Text search returned {len(text_results.get('ids', [[]])[0])} results")
-
-	# Image collection search using CLIP text encoder
-	clip_text_emb = embed_clip_text([query])[0]
-	image_results = query_images(clip_text_emb, top_k=top_k)
 	logger.debug(f"Image search returned {len(image_results.get('ids', [[]])[0])} results")
 
-	merged: List[Dict[str, Any]] = []
-
 	# Normalize distances/similarities: Chroma returns distances for cosine by default; smaller is better
 	# Convert to similarity = 1 - distance for ease of merging, then normalize per modality
-	text_scores_raw = []
+	text_scores_raw = np.empty(0)
 	if text_results.get("distances"):
-		text_scores_raw = [1.0 - d for d in text_results["distances"][0]]
-	text_scores = _normalize_scores(text_scores_raw)
+		text_scores_raw = 1.0 - np.asarray(text_results["distances"][0], dtype=np.float64)
+	text_ids = text_results.get("ids", [[]])[0]
+	text_scores = _pad_scores(_normalize_scores(text_scores_raw), len(text_ids))
 
-	image_scores_raw = []
+	image_scores_raw = np.empty(0)
 	if image_results.get("distances"):
-		image_scores_raw = [1.0 - d for d in image_results["distances"][0]]
-	image_scores = _normalize_scores(image_scores_raw)
-
-	# Process text results
-	for i, _id in enumerate(text_results.get("ids", [[]])[0]):
-		metadata = text_results.get("metadatas", [[]])[0][i] if text_results.get("metadatas") else {}
-		merged.append({
-			"id": _id,
-			"score": text_scores[i] if i < len(text_scores) else 0.0,
-			"modality": "text",
-			"document": text_results.get("documents", [[]])[0][i] if text_results.get("documents") else None,
-			"metadata": metadata,
-			"source": _format_source_attribution(metadata),
-		})
-
-	# Process image results
-	for i, _id in enumerate(image_results.get("ids", [[]])[0]):
-		metadata = image_results.get("metadatas", [[]])[0][i] if image_results.get("metadatas") else {}
-		merged.append({
-			"id": _id,
-			"score": image_scores[i] if i < len(image_scores) else 0.0,
-			"modality": "image",
-			"document": None,
-			"metadata": metadata,
-			"source": _format_source_attribution(metadata),
-			"ocr_text": metadata.get("ocr_text", ""),
-		})
-
-	# Sort merged results by score desc and keep top_k
-	merged.sort(key=lambda x: x["score"], reverse=True)
-	final_results = merged[:top_k]
+		image_scores_raw = 1.0 - np.asarray(image_results["distances"][0], dtype=np.float64)
+	image_ids = image_results.get("ids", [[]])[0]
+	image_scores = _pad_scores(_normalize_scores(image_scores_raw), len(image_ids))
+
+	# Rank scores numerically first, then build result dicts only for the winners
+	final_results: List[Dict[str, Any]] = []
+	for idx in _select_top_k(text_scores, image_scores, top_k):
+		if idx < len(text_ids):
+			i = int(idx)
+			metadata = text_results.get("metadatas", [[]])[0][i] if text_results.get("metadatas") else {}
+			final_results.append({
+				"id": text_ids[i],
+				"score": text_scores[i],
+				"modality": "text",
+				"document": text_results.get("documents", [[]])[0][i] if text_results.get("documents") else None,
+				"metadata": metadata,
+				"source": _format_source_attribution(metadata),
+			})
+		else:
+			i = int(idx) - len(text_ids)
+			metadata = image_results.get("metadatas", [[]])[0][i] if image_results.get("metadatas") else {}
+			final_results.append({
+				"id": image_ids[i],
+				"score": image_scores[i],
+				"modality": "image",
+				"document": None,
+				"metadata": metadata,
+				"source": _format_source_attribution(metadata),
+				"ocr_text": metadata.get("ocr_text", ""),
+			})
 	
 	logger.info(f"Returning {len(final_results)} merged results")
 	return {"query": query, "results": final_results, "total_results": len(final_results)}
@@ -5,7 +5,10 @@ Manages persistent storage of text and image embeddings in separate collections
 to maintain embedding space consistency.
 """
 
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
+import os
+import numpy as np
 import chromadb
 from chromadb.config import Settings
 import logging
@@ -16,17 +19,79 @@ CHROMA_PERSIST_DIR = "data/chroma"
 TEXT_COLLECTION = "documents_text"
 IMAGE_COLLECTION = "documents_image"
 
+# HNSW index parameters; M and construction_ef only apply when a collection is created
+HNSW_METADATA: Dict[str, Any] = {
+	"hnsw:space": "cosine",
+	"hnsw:M": int(os.getenv("CHROMA_HNSW_M", 32)),
+	"hnsw:construction_ef": int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", 200)),
+	"hnsw:search_ef": int(os.getenv("CHROMA_HNSW_SEARCH_EF", 64)),
+}
+if os.getenv("CHROMA_HNSW_NUM_THREADS"):
+	HNSW_METADATA["hnsw:num_threads"] = int(os.environ["CHROMA_HNSW_NUM_THREADS"])
 
-def get_chroma_client() -> chromadb.Client:
+
+@lru_cache(maxsize=None)
+def _client_for(persist_dir: str) -> chromadb.Client:
 	"""
-	Get or create a persistent ChromaDB client.
+	Create a persistent ChromaDB client for a directory, once per process.
 	
+	Args:
+		persist_dir: Directory backing the client
+		
 	Returns:
 		chromadb.Client: Persistent client with anonymized telemetry disabled
 	"""
-	logger.debug(f"Initializing ChromaDB client at {CHROMA_PERSIST_DIR}")
-	client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR, settings=Settings(anonymized_telemetry=False))
-	return client
+	logger.debug(f"Initializing ChromaDB client at {persist_dir}")
+	return chromadb.PersistentClient(path=persist_dir, settings=Settings(anonymized_telemetry=False))
+
+
+@lru_cache(maxsize=None)
+def _collection_for(persist_dir: str, name: str) -> Any:
+	"""
+	Get or create a collection, caching the handle per directory and name.
+	
+	Args:
+		persist_dir: Directory backing the client
+		name: Collection name
+		
+	Returns:
+		Collection: Cosine-space ChromaDB collection with HNSW_METADATA settings
+	"""
+	logger.debug(f"Retrieving collection: {name}")
+	return _client_for(persist_dir).get_or_create_collection(name=name, metadata=HNSW_METADATA)
+
+
+def get_chroma_client() -> chromadb.Client:
+	"""
+	Get the persistent ChromaDB client for CHROMA_PERSIST_DIR.
+	
+	The client is created once (at application startup) and shared by
+	every request afterwards.
+	
+	Returns:
+		chromadb.Client: Cached persistent client
+	"""
+	return _client_for(CHROMA_PERSIST_DIR)
+
+
+def get_text_collection() -> Any:
+	"""
+	Get or create the text collection.
+	
+	Returns:
+		Collection: Cached text collection
+	"""
+	return _collection_for(CHROMA_PERSIST_DIR, TEXT_COLLECTION)
+
+
+def get_image_collection() -> Any:
+	"""
+	Get or create the image collection.
+	
+	Returns:
+		Collection: Cached image collection
+	"""
+	return _collection_for(CHROMA_PERSIST_DIR, IMAGE_COLLECTION)
 
 
 def get_collections() -> Tuple[Any, Any]:
@@ -36,11 +101,7 @@ def get_collections() -> Tuple[Any, Any]:
 	Returns:
 		Tuple[Collection, Collection]: Text collection and image collection
 	"""
-	client = get_chroma_client()
-	text = client.get_or_create_collection(name=TEXT_COLLECTION, metadata={"hnsw:space": "cosine"})
-	image = client.get_or_create_collection(name=IMAGE_COLLECTION, metadata={"hnsw:space": "cosine"})
-	logger.debug(f"Retrieved collections: {TEXT_COLLECTION}, {IMAGE_COLLECTION}")
-	return text, image
+	return get_text_collection(), get_image_collection()
 
 
 def upsert_text(ids: List[str], embeddings, metadatas: List[Dict[str, Any]], documents: List[str]) -> None:
@@ -53,7 +114,7 @@ def upsert_text(ids: List[str], embeddings, metadatas: List[Dict[str, Any]], doc
 		metadatas: List of metadata dictionaries
 		documents: List of text content
 	"""
-	text, _ = get_collections()
+	text = get_text_collection()
 	logger.info(f"Upserting {len(ids)} text documents")
 	text.upsert(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas, documents=documents)
 
@@ -67,7 +128,7 @@ def upsert_images(ids: List[str], embeddings, metadatas: List[Dict[str, Any]]) -
 		embeddings: Numpy array of embeddings
 		metadatas: List of metadata dictionaries
 	"""
-	_, image = get_collections()
+	image = get_image_collection()
 	logger.info(f"Upserting {len(ids)} images")
 	image.upsert(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas)
 
@@ -77,15 +138,15 @@ def query_text(query_embedding, top_k: int = 5) -> Dict[str, Any]:
 	Query the text collection for similar documents.
 	
 	Args:
-		query_embedding: Query embedding vector
-		top_k: Number of results to return
+		query_embedding: Query embedding vector, or a 2D array of several queries
+		top_k: Number of results to return per query
 		
 	Returns:
-		Dict containing ids, distances, metadatas, and documents
+		Dict containing ids, distances, metadatas, and documents (one list per query)
 	"""
-	text, _ = get_collections()
+	text = get_text_collection()
 	logger.debug(f"Querying text collection with top_k={top_k}")
-	return text.query(query_embeddings=[query_embedding.tolist()], n_results=top_k)
+	return text.query(query_embeddings=np.atleast_2d(query_embedding).tolist(), n_results=top_k)
 
 
 def query_images(query_embedding, top_k: int = 5) -> Dict[str, Any]:
@@ -93,14 +154,14 @@ def query_images(query_embedding, top_k: int = 5) -> Dict[str, Any]:
 	Query the image collection for similar images.
 	
 	Args:
-		query_embedding: Query embedding vector
-		top_k: Number of results to return
+		query_embedding: Query embedding vector, or a 2D array of several queries
+		top_k: Number of results to return per query
 		
 	Returns:
-		Dict containing ids, distances, and metadatas
+		Dict containing ids, distances, and metadatas (one list per query)
 	"""
-	_, image = get_collections()
+	image = get_image_collection()
 	logger.debug(f"Querying image collection with top_k={top_k}")
-	return image.query(query_embeddings=[query_embedding.tolist()], n_results=top_k)
+	return image.query(query_embeddings=np.atleast_2d(query_embedding).tolist(), n_results=top_k)
 
 
@@ -4,8 +4,9 @@ OCR utilities using Tesseract for text extraction from images.
 Provides graceful fallback when Tesseract is not available.
 """
 
-from typing import Optional
+from typing import List, Optional
 import os
+import tempfile
 import logging
 from PIL import Image
 import pytesseract
@@ -42,3 +43,48 @@ def ocr_image(image: Image.Image, lang: str = "eng") -> str:
 	except Exception as e:
 		logger.error(f"OCR error: {e}")
 		return ""
+
+
+def ocr_images(images: List[Image.Image], lang: str = "eng") -> List[str]:
+	"""
+	Extract text from several images with a single Tesseract invocation.
+	
+	The images are written as one uncompressed multi-page TIFF, so Tesseract
+	starts and loads its language data once for the whole group instead of
+	once per image. Falls back to per-image OCR if the output cannot be
+	split back into one text per page.
+	
+	Args:
+		images: PIL Image objects to process
+		lang: Language code for OCR (default: "eng")
+		
+	Returns:
+		List of extracted text strings, one per image (empty on failure)
+	"""
+	if len(images) <= 1:
+		return [ocr_image(image, lang=lang) for image in images]
+	tiff_path = None
+	try:
+		with tempfile.NamedTemporaryFile(suffix=".tif", delete=False) as tmp:
+			tiff_path = tmp.name
+		images[0].save(tiff_path, save_all=True, append_images=images[1:])
+		# Tesseract ends each page's text with a form feed, leaving one empty trailing piece
+		pages = pytesseract.image_to_string(tiff_path, lang=lang).split("\f")
+		if len(pages) == len(images) + 1 and not pages[-1].strip():
+			pages.pop()
+		if len(pages) != len(images):
+			# Any other count means the split cannot be trusted to line up with pages
+			logger.warning(f"OCR returned {len(pages)} pages for {len(images)} images; retrying per image")
+			return [ocr_image(image, lang=lang) for image in images]
+		extracted = [page.strip() for page in pages]
+		logger.debug(f"OCR extracted {sum(len(t) for t in extracted)} characters from {len(images)} images")
+		return extracted
+	except TesseractNotFoundError:
+		logger.warning("Tesseract not found; proceeding without OCR text")
+		return [""] * len(images)
+	except Exception as e:
+		logger.error(f"OCR error: {e}")
+		return [""] * len(images)
+	finally:
+		if tiff_path and os.path.exists(tiff_path):
+			os.remove(tiff_path)
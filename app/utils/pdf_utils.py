@@ -5,7 +5,10 @@ Handles extraction of text content and rendering of PDF pages as images
 for OCR processing.
 """
 
-from typing import List, Tuple, Dict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+import multiprocessing
 import os
 from io import BytesIO
 import logging
@@ -16,11 +19,68 @@ from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Each worker handles at least this many pages; shorter PDFs are extracted serially.
+# A warm pool costs ~3-11 ms per call (dispatch plus each worker re-parsing the
+# file) against ~1.7 ms per page of extraction, so 16 pages per worker keeps the
+# parallel path well clear of break-even.
+PARALLEL_MIN_PAGES = 16
+TEXT_EXTRACT_MAX_WORKERS = os.cpu_count() or 1
+
+
+@lru_cache(maxsize=None)
+def _text_pool(workers: int) -> ProcessPoolExecutor:
+	"""
+	Get the long-lived process pool for text extraction, created on first use.
+	
+	Spawning workers takes ~1s, so the pool is shared by every upload rather
+	than created per call.
+	
+	Args:
+		workers: Number of worker processes
+		
+	Returns:
+		ProcessPoolExecutor: Shared pool using the spawn start method
+	"""
+	# spawn avoids forking a server process that already runs torch/OCR threads
+	return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _extract_pages(reader: PdfReader, start: int, stop: int) -> List[Tuple[int, str]]:
+	"""
+	Extract text from a contiguous range of pages of an open PDF.
+	
+	Args:
+		reader: Open PdfReader
+		start: First page index (zero-based)
+		stop: Page index to stop before
+		
+	Returns:
+		List of tuples containing (page_number, text_content)
+	"""
+	return [(idx + 1, (reader.pages[idx].extract_text() or "").strip()) for idx in range(start, stop)]
+
+
+def _extract_page_range(task: Tuple[str, int, int]) -> List[Tuple[int, str]]:
+	"""
+	Extract text from a contiguous range of pages (process pool worker).
+	
+	Args:
+		task: Tuple of (pdf_path, start_index, stop_index), zero-based and half-open
+		
+	Returns:
+		List of tuples containing (page_number, text_content)
+	"""
+	pdf_path, start, stop = task
+	return _extract_pages(PdfReader(pdf_path), start, stop)
+
 
 def extract_pdf_text_per_page(pdf_path: str) -> List[Tuple[int, str]]:
 	"""
 	Extract text content from each page of a PDF.
 	
+	Long PDFs are split into contiguous page ranges extracted in parallel
+	worker processes (pypdf is pure Python, so threads would not help).
+	
 	Args:
 		pdf_path: Path to the PDF file
 		
@@ -30,10 +90,16 @@ def extract_pdf_text_per_page(pdf_path: str) -> List[Tuple[int, str]]:
 	pages: List[Tuple[int, str]] = []
 	try:
 		reader = PdfReader(pdf_path)
-		logger.info(f"Extracting text from {len(reader.pages)} pages in {pdf_path}")
-		for idx, page in enumerate(reader.pages, start=1):
-			text = page.extract_text() or ""
-			pages.append((idx, text.strip()))
+		num_pages = len(reader.pages)
+		logger.info(f"Extracting text from {num_pages} pages in {pdf_path}")
+		workers = min(TEXT_EXTRACT_MAX_WORKERS, num_pages // PARALLEL_MIN_PAGES)
+		if workers <= 1:
+			pages = _extract_pages(reader, 0, num_pages)
+		else:
+			step = -(-num_pages // workers)
+			tasks = [(pdf_path, start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+			for chunk in _text_pool(TEXT_EXTRACT_MAX_WORKERS).map(_extract_page_range, tasks):
+				pages.extend(chunk)
 		logger.debug(f"Extracted text from {len(pages)} pages")
 	except Exception as e:
 		logger.error(f"Error extracting text from PDF {pdf_path}: {e}")
@@ -41,38 +107,38 @@ def extract_pdf_text_per_page(pdf_path: str) -> List[Tuple[int, str]]:
 	return pages
 
 
-def extract_pdf_images(pdf_path: str, output_dir: str) -> List[Dict]:
+def extract_pdf_images(pdf_path: str, output_dir: Optional[str] = None) -> Iterator[Tuple[int, Image.Image, Optional[str]]]:
 	"""
 	Render each PDF page as an image for OCR processing.
 	
 	This approach is robust on Windows and avoids native builds by using
 	pypdfium2 to render pages at 2x scale for better OCR accuracy.
+	Pages are rendered lazily so callers can start processing early pages
+	while later ones are still being rendered.
 	
 	Args:
 		pdf_path: Path to the PDF file
-		output_dir: Directory to save rendered page images
+		output_dir: Optional directory to also save rendered pages as PNG
 		
-	Returns:
-		List of dictionaries containing page number and image path
+	Yields:
+		Tuples containing (page_number, rendered PIL image, saved PNG path or None)
 	"""
-	os.makedirs(output_dir, exist_ok=True)
-	records: List[Dict] = []
+	if output_dir:
+		os.makedirs(output_dir, exist_ok=True)
 	try:
 		pdf = pdfium.PdfDocument(pdf_path)
 		logger.info(f"Rendering {len(pdf)} pages from {pdf_path} as images")
 		for page_index in range(len(pdf)):
 			page = pdf[page_index]
 			bitmap = page.render(scale=2.0)  # reasonable scale for OCR
-			pil_image: Image.Image = bitmap.to_pil().convert("RGB")
-			filename = f"page{page_index + 1}.png"
-			out_path = os.path.join(output_dir, filename)
-			pil_image.save(out_path)
-			records.append({
-				"page": page_index + 1,
-				"path": out_path,
-			})
-		logger.debug(f"Rendered {len(records)} page images to {output_dir}")
+			# Default BGR render is decoded into a fresh RGB image, no convert() needed
+			pil_image: Image.Image = bitmap.to_pil()
+			out_path = None
+			if output_dir:
+				out_path = os.path.join(output_dir, f"page{page_index + 1}.png")
+				pil_image.save(out_path)
+			yield page_index + 1, pil_image, out_path
+		logger.debug(f"Rendered {len(pdf)} page images from {pdf_path}")
 	except Exception as e:
 		logger.error(f"Error rendering PDF pages from {pdf_path}: {e}")
 		raise
-	return records
@@ -4,85 +4,116 @@ Test runner script for the Multimodal RAG System.
 This script runs all unit tests and displays results.
 """
 
-import subprocess
+import importlib.util
 import sys
 
+SEP = "=" * 60
+# Report the ten slowest tests (ignoring sub-100ms noise) on every run
+DURATION_ARGS = ["--durations=10", "--durations-min=0.1"]
 
-def run_tests():
-    """Run all unit tests."""
-    print("=" * 60)
-    print("Running Unit Tests for Multimodal RAG System")
-    print("=" * 60)
-    print()
+
+def _parallel_args():
+    """Return pytest-xdist arguments, or none if xdist is not installed."""
+    if importlib.util.find_spec("xdist") is None:
+        print("pytest-xdist not found; running tests serially")
+        print("  (install it with: pip install pytest-xdist)")
+        print()
+        return []
+    # loadfile keeps each test module on one worker so model/DB setup is shared
+    return ["-n", "auto", "--dist=loadfile"]
+
+
+def _print_header(title):
+    """Print a section title between separator lines, in a single write."""
+    print(f"{SEP}\n{title}\n{SEP}\n")
+
+
+def run_tests(extra_args=()):
+    """Run all unit tests, passing any extra arguments through to pytest."""
+    _print_header("Running Unit Tests for Multimodal RAG System")
     
     try:
-        # Run pytest with verbose output
-        result = subprocess.run(
-            [sys.executable, "-m", "pytest", "tests/", "-v", "--tb=short"],
-            capture_output=False,
-            text=True
-        )
+        import pytest
+    except ImportError:
+        print("✗ pytest not found. Install it with: pip install pytest")
+        return 1
+    
+    try:
+        # Run pytest in-process with verbose output
+        returncode = int(pytest.main(
+            ["tests/", "--tb=short"] + DURATION_ARGS + _parallel_args() + list(extra_args)
+        ))
         
         print()
-        print("=" * 60)
-        if result.returncode == 0:
+        print(SEP)
+        if returncode == 0:
             print("✓ All tests passed!")
         else:
             print("✗ Some tests failed. See output above.")
-        print("=" * 60)
+        print(SEP)
         
-        return result.returncode
+        return returncode
         
-    except FileNotFoundError:
-        print("✗ pytest not found. Install it with: pip install pytest")
-        return 1
     except Exception as e:
         print(f"✗ Error running tests: {e}")
         return 1
 
 
-def run_tests_with_coverage():
-    """Run tests with coverage report."""
-    print("=" * 60)
-    print("Running Tests with Coverage")
-    print("=" * 60)
-    print()
+def run_tests_with_coverage(extra_args=()):
+    """Run tests with coverage report, passing any extra arguments through to pytest."""
+    _print_header("Running Tests with Coverage")
+    
+    try:
+        import pytest
+    except ImportError:
+        print("✗ pytest not found. Install it with: pip install pytest")
+        return 1
+    if importlib.util.find_spec("pytest_cov") is None:
+        print("✗ pytest-cov not found. Install it with: pip install pytest-cov")
+        return 1
     
     try:
-        # Run pytest with coverage
-        result = subprocess.run(
-            [sys.executable, "-m", "pytest", "tests/", "-v", 
-             "--cov=app", "--cov-report=term-missing"],
-            capture_output=False,
-            text=True
-        )
+        # Run pytest in-process; pytest-cov also collects coverage from xdist workers
+        returncode = int(pytest.main(
+            ["tests/", "--cov=app", "--cov-report=term-missing"]
+            + DURATION_ARGS + _parallel_args() + list(extra_args)
+        ))
         
         print()
-        print("=" * 60)
-        if result.returncode == 0:
+        print(SEP)
+        if returncode == 0:
             print("✓ All tests passed with coverage report!")
         else:
             print("✗ Some tests failed. See output above.")
-        print("=" * 60)
+        print(SEP)
         
-        return result.returncode
+        return returncode
         
-    except FileNotFoundError:
-        print("✗ pytest-cov not found. Install it with: pip install pytest-cov")
-        return 1
     except Exception as e:
         print(f"✗ Error running tests: {e}")
         return 1
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == "--coverage":
-        exit_code = run_tests_with_coverage()
+    flags = sys.argv[1:]
+    # --fast: run only the tests that failed last time (pytest's cache provider);
+    # runs everything when there are no recorded failures
+    extra_args = ["--lf"] if "--fast" in flags else []
+    # --slow: also run model-loading tests, which pytest.ini deselects by default
+    if "--slow" in flags:
+        extra_args += ["-m", ""]
+    
+    if "--coverage" in flags:
+        exit_code = run_tests_with_coverage(extra_args)
     else:
-        exit_code = run_tests()
+        exit_code = run_tests(extra_args)
         
         if exit_code == 0:
             print("\nTip: Run with --coverage flag for coverage report:")
             print("  python run_tests.py --coverage")
+            print("Tip: Run with --fast to run only the tests that failed last time:")
+            print("  python run_tests.py --fast")
+            print("Tip: Run with --slow to include the model-loading embedding tests:")
+            print("  python run_tests.py --slow")
     
     sys.exit(exit_code)
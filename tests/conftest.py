@@ -0,0 +1,108 @@
+"""
+Shared pytest fixtures for the test suite.
+"""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="session")
+def embedding_models():
+	"""Load and warm up both embedding models once per test session (per xdist worker)."""
+	from app.embeddings import EmbeddingModels
+	EmbeddingModels.warm_up()
+	return EmbeddingModels
+
+
+TEST_SENTENCES = [
+	"This is a test sentence.",
+	"First sentence.",
+	"Second sentence.",
+	"Third sentence.",
+	"Test normalization",
+	"Machine learning",
+	"Artificial intelligence",
+]
+
+
+@pytest.fixture(scope="session")
+def text_embeddings(embedding_models):
+	"""Embed every test sentence in one batched call; maps sentence -> embedding row."""
+	from app.embeddings import embed_text
+	return dict(zip(TEST_SENTENCES, embed_text(TEST_SENTENCES)))
+
+
+@pytest.fixture(scope="session")
+def test_images():
+	"""Small solid-colour RGB images keyed by colour, built once per session."""
+	from PIL import Image
+	return {color: Image.new("RGB", (100, 100), color=color) for color in ("red", "green", "blue")}
+
+
+@pytest.fixture(scope="session")
+def test_image(test_images):
+	"""The default 100x100 red test image."""
+	return test_images["red"]
+
+
+@pytest.fixture(scope="session")
+def test_image_emb(embedding_models, test_image):
+	"""CLIP embedding of test_image, computed once per session."""
+	from app.embeddings import embed_image
+	return embed_image(test_image)
+
+
+@pytest.fixture(scope="module")
+def ephemeral_chroma():
+	"""
+	Route app.storage to an in-memory Chroma client for one test module.
+	
+	The collection cache is swapped for a fresh one, so handles created here
+	never leak into the real (persistent) cache after the module finishes.
+	"""
+	from functools import lru_cache
+	import chromadb
+	from chromadb.config import Settings
+	import app.storage as storage
+
+	client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr(storage, "_client_for", lambda persist_dir: client)
+		# Tiny HNSW graphs: tests insert a handful of vectors
+		mp.setattr(storage, "HNSW_METADATA", {"hnsw:space": "cosine", "hnsw:M": 4, "hnsw:construction_ef": 8})
+		mp.setattr(storage, "_collection_for", lru_cache(maxsize=None)(storage._collection_for.__wrapped__))
+		yield client
+
+
+@pytest.fixture
+def fresh_collections(ephemeral_chroma):
+	"""
+	Point app.storage at uniquely named text/image collections for one test.
+	
+	Names are globally unique, so tests never see each other's vectors and
+	xdist workers cannot collide; both collections are dropped on teardown.
+	"""
+	from uuid import uuid4
+	import app.storage as storage
+
+	suffix = uuid4().hex
+	names = (f"text_{suffix}", f"image_{suffix}")
+	with pytest.MonkeyPatch.context() as mp:
+		mp.setattr(storage, "TEXT_COLLECTION", names[0])
+		mp.setattr(storage, "IMAGE_COLLECTION", names[1])
+		yield names
+	for name in names:
+		try:
+			ephemeral_chroma.delete_collection(name)
+		except ValueError:
+			pass  # never created by this test
+	storage._collection_for.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def norm_embs():
+	"""Deterministic random embeddings (8 x 512), L2-normalized once per session."""
+	rng = np.random.default_rng(42)
+	embs = rng.random((8, 512), dtype=np.float32)
+	embs /= np.linalg.norm(embs, axis=1, keepdims=True)
+	return embs
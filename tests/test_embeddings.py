@@ -2,80 +2,98 @@
 Unit tests for embedding generation module.
 """
 
-import unittest
+import pytest
 import numpy as np
 from PIL import Image
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from app.embeddings import embed_text, embed_clip_text, embed_image, EmbeddingModels
-
-
-class TestEmbeddings(unittest.TestCase):
-	"""Test cases for embedding functions."""
-	
-	def test_embed_text_single(self):
-		"""Test text embedding generation for single text."""
-		texts = ["This is a test sentence."]
-		embeddings = embed_text(texts)
-		
-		self.assertIsInstance(embeddings, np.ndarray)
-		self.assertEqual(embeddings.shape[0], 1)
-		self.assertGreater(embeddings.shape[1], 0)
-		
-	def test_embed_text_multiple(self):
-		"""Test text embedding generation for multiple texts."""
-		texts = ["First sentence.", "Second sentence.", "Third sentence."]
-		embeddings = embed_text(texts)
-		
-		self.assertEqual(embeddings.shape[0], 3)
-		
-	def test_embed_text_normalization(self):
-		"""Test that text embeddings are normalized."""
-		texts = ["Test normalization"]
-		embeddings = embed_text(texts)
-		
-		# Check if embeddings are approximately normalized (L2 norm ≈ 1)
-		norm = np.linalg.norm(embeddings[0])
-		self.assertAlmostEqual(norm, 1.0, places=5)
-		
-	def test_embed_clip_text(self):
-		"""Test CLIP text embedding generation."""
-		texts = ["A photo of a cat"]
-		embeddings = embed_clip_text(texts)
-		
-		self.assertIsInstance(embeddings, np.ndarray)
-		self.assertEqual(embeddings.shape[0], 1)
-		
-	def test_embed_image(self):
-		"""Test image embedding generation."""
-		# Create a simple test image
-		img = Image.new('RGB', (100, 100), color='red')
-		embeddings = embed_image(img)
-		
-		self.assertIsInstance(embeddings, np.ndarray)
-		self.assertEqual(embeddings.shape[0], 1)
-		self.assertGreater(embeddings.shape[1], 0)
-		
-	def test_embedding_models_singleton(self):
-		"""Test that embedding models use singleton pattern."""
-		model1 = EmbeddingModels.get_text_model()
-		model2 = EmbeddingModels.get_text_model()
-		
-		# Should be the same instance
-		self.assertIs(model1, model2)
-		
-	def test_different_texts_different_embeddings(self):
-		"""Test that different texts produce different embeddings."""
-		texts = ["Machine learning", "Artificial intelligence"]
-		embeddings = embed_text(texts)
-		
-		# Embeddings should not be identical
-		self.assertFalse(np.allclose(embeddings[0], embeddings[1]))
-
-
-if __name__ == '__main__':
-	unittest.main()
+
+from app.embeddings import embed_text, embed_clip_text, embed_images_batch, EmbeddingModels, _shrink_for_clip
+
+pytestmark = [pytest.mark.slow, pytest.mark.usefixtures("embedding_models")]
+
+
+def test_embed_text_single(text_embeddings):
+	"""Test text embedding generation for single text."""
+	embedding = text_embeddings["This is a test sentence."]
+
+	assert isinstance(embedding, np.ndarray)
+	assert embedding.ndim == 1
+	assert embedding.shape[0] > 0
+
+
+def test_embed_text_multiple(text_embeddings):
+	"""Test text embedding generation for multiple texts."""
+	texts = ["First sentence.", "Second sentence.", "Third sentence."]
+	embeddings = np.stack([text_embeddings[t] for t in texts])
+
+	assert embeddings.shape[0] == 3
+	assert len({e.shape for e in embeddings}) == 1
+
+
+def test_embed_text_normalization(text_embeddings):
+	"""Test that text embeddings are normalized."""
+	# Check if embeddings are approximately normalized (L2 norm ≈ 1)
+	norm = np.linalg.norm(text_embeddings["Test normalization"])
+	assert norm == pytest.approx(1.0, abs=1e-5)
+
+
+def test_embed_text_preserves_order():
+	"""Test that mixed-length inputs come back in input order."""
+	texts = ["Short.", " ".join(["A much longer sentence about data."] * 20), "Mid-sized text here."]
+	embeddings = embed_text(texts)
+
+	for i, text in enumerate(texts):
+		assert np.allclose(embeddings[i], embed_text([text])[0], atol=1e-5)
+
+
+def test_embed_clip_text():
+	"""Test CLIP text embedding generation."""
+	texts = ["A photo of a cat"]
+	embeddings = embed_clip_text(texts)
+
+	assert isinstance(embeddings, np.ndarray)
+	assert embeddings.shape[0] == 1
+
+
+def test_embed_image(test_image_emb):
+	"""Test image embedding generation."""
+	embeddings = test_image_emb
+
+	assert isinstance(embeddings, np.ndarray)
+	assert embeddings.shape[0] == 1
+	assert embeddings.shape[1] > 0
+
+
+def test_embed_images_batch(test_images, test_image_emb):
+	"""Test batched image embeddings match single-image embeddings."""
+	imgs = [test_images[c] for c in ('red', 'green', 'blue')]
+	embeddings = embed_images_batch(imgs, batch_size=2)
+
+	assert embeddings.shape[0] == 3
+	assert np.allclose(embeddings[0], test_image_emb[0], atol=1e-5)
+
+
+def test_shrink_for_clip(test_image):
+	"""Test that only large images are reduced before CLIP."""
+	page = Image.new('RGB', (1700, 2200), color='white')
+
+	assert _shrink_for_clip(test_image) is test_image
+	assert min(_shrink_for_clip(page).size) >= 448
+	assert min(_shrink_for_clip(page).size) < 1700
+
+
+def test_embedding_models_singleton():
+	"""Test that embedding models use singleton pattern."""
+	model1 = EmbeddingModels.get_text_model()
+	model2 = EmbeddingModels.get_text_model()
+
+	# Should be the same instance
+	assert model1 is model2
+
+
+def test_different_texts_different_embeddings(text_embeddings):
+	"""Test that different texts produce different embeddings."""
+	ml = text_embeddings["Machine learning"]
+	ai = text_embeddings["Artificial intelligence"]
+
+	# Embeddings should not be identical
+	assert not np.allclose(ml, ai)
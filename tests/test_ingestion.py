@@ -0,0 +1,72 @@
+"""
+Unit tests for ingestion chunking and batched text upserts.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import app.ingestion as ingestion
+from app.ingestion import _batched, _iter_paragraphs
+
+
+def _split_paragraphs(text):
+	"""The original eager chunking that _iter_paragraphs replaces."""
+	return [chunk.strip() for chunk in text.split("\n\n") if chunk.strip()]
+
+
+@pytest.mark.parametrize("text", [
+	"",
+	"single paragraph",
+	"first\n\nsecond",
+	"first\n\n\nsecond",
+	"first\n\n\n\nsecond",
+	"\n\n",
+	"\n\n\n\n\n",
+	"first\n\n   \n\nsecond",
+	"first\n\n\t \n\n\n\n  second  \n\n",
+	"  leading and trailing whitespace  ",
+	"\n\nstarts with a blank line",
+	"ends with a blank line\n\n",
+	"line one\nline two\n\nline three",
+	"a\r\n\r\nb",
+], ids=[
+	"empty", "single", "two", "three_newlines", "blank_paragraph",
+	"only_separator", "only_newlines", "whitespace_paragraph", "mixed_whitespace",
+	"padded", "leading_blank", "trailing_blank", "single_newlines", "crlf",
+])
+def test_iter_paragraphs_matches_split(text):
+	"""Test that the streaming splitter yields exactly the old split/strip/filter chunks."""
+	assert list(_iter_paragraphs(text)) == _split_paragraphs(text)
+
+
+def test_batched():
+	"""Test grouping into fixed-size batches with a short final batch."""
+	assert list(_batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+	assert list(_batched([], 3)) == []
+
+
+def test_ingest_text_ids_continuous_across_batches(tmp_path, monkeypatch):
+	"""Test that ids and chunk_index run 0..N-1 across the TEXT_BATCH_SIZE boundary."""
+	num_paragraphs = ingestion.TEXT_BATCH_SIZE + 44
+	path = tmp_path / "doc.txt"
+	path.write_text("\n\n".join(f"Paragraph {i}" for i in range(num_paragraphs)), encoding="utf-8")
+
+	upserts = []
+	monkeypatch.setattr(ingestion, "embed_text", lambda chunks: np.zeros((len(chunks), 4), dtype=np.float32))
+	monkeypatch.setattr(ingestion, "upsert_text", lambda **kwargs: upserts.append(kwargs))
+
+	result = asyncio.run(ingestion._ingest_text(str(path)))
+
+	assert result["ingested_chunks"] == num_paragraphs
+	assert [len(call["ids"]) for call in upserts] == [ingestion.TEXT_BATCH_SIZE, 44]
+
+	doc_id = result["doc_id"]
+	ids = [i for call in upserts for i in call["ids"]]
+	metas = [m for call in upserts for m in call["metadatas"]]
+	documents = [d for call in upserts for d in call["documents"]]
+	assert ids == [f"txt::{doc_id}::{i}" for i in range(num_paragraphs)]
+	assert [m["chunk_index"] for m in metas] == list(range(num_paragraphs))
+	assert documents == [f"Paragraph {i}" for i in range(num_paragraphs)]
+	assert all(len(call["embeddings"]) == len(call["ids"]) for call in upserts)
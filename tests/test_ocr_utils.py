@@ -0,0 +1,94 @@
+"""
+Unit tests for OCR utilities (Tesseract is mocked; no binary required).
+"""
+
+import os
+
+import pytest
+from PIL import Image
+from pytesseract import TesseractNotFoundError
+
+import app.utils.ocr_utils as ocr_utils
+from app.utils.ocr_utils import ocr_images
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch, test_images):
+	"""
+	Replace pytesseract.image_to_string with a recorder.
+
+	Set ``fake.batch_output`` to the string returned for the multi-page TIFF;
+	single images get "text-<colour>" so per-image fallback results are
+	distinguishable. Every call's input is recorded in ``fake.calls``.
+	"""
+	colors = {image.getpixel((0, 0)): name for name, image in test_images.items()}
+
+	class FakeTesseract:
+		batch_output = ""
+		calls = []
+		tiff_frames = None
+
+		def __call__(self, image, lang="eng"):
+			self.calls.append(image)
+			if isinstance(image, str):
+				with Image.open(image) as tiff:
+					self.tiff_frames = tiff.n_frames
+				return self.batch_output
+			return f"text-{colors[image.getpixel((0, 0))]}"
+
+	fake = FakeTesseract()
+	monkeypatch.setattr(ocr_utils.pytesseract, "image_to_string", fake)
+	return fake
+
+
+@pytest.fixture
+def rgb_images(test_images):
+	"""The three session test images in a fixed order."""
+	return [test_images[c] for c in ("red", "green", "blue")]
+
+
+@pytest.mark.parametrize("batch_output", [
+	"one\f two \fthree\f",
+	"one\f two \fthree",
+], ids=["trailing_form_feed", "exact_pages"])
+def test_ocr_images_splits_batch_output(fake_tesseract, rgb_images, batch_output):
+	"""Test that one TIFF pass is split back into one stripped text per image."""
+	fake_tesseract.batch_output = batch_output
+
+	texts = ocr_images(rgb_images)
+
+	assert texts == ["one", "two", "three"]
+	assert len(fake_tesseract.calls) == 1
+	assert fake_tesseract.tiff_frames == 3
+	assert not os.path.exists(fake_tesseract.calls[0])
+
+
+def test_ocr_images_empty_page_keeps_alignment(fake_tesseract, rgb_images):
+	"""Test that a page without text still occupies its slot."""
+	fake_tesseract.batch_output = "one\f\fthree\f"
+
+	assert ocr_images(rgb_images) == ["one", "", "three"]
+
+
+@pytest.mark.parametrize("batch_output", [
+	"one\ftwo",
+	"one\ftwo\fthree\ffour\f",
+], ids=["too_few_pages", "too_many_pages"])
+def test_ocr_images_falls_back_per_image(fake_tesseract, rgb_images, batch_output):
+	"""Test that a page count mismatch re-runs OCR on each image individually."""
+	fake_tesseract.batch_output = batch_output
+
+	texts = ocr_images(rgb_images)
+
+	assert texts == ["text-red", "text-green", "text-blue"]
+	assert fake_tesseract.calls[1:] == rgb_images
+
+
+def test_ocr_images_tesseract_not_found(monkeypatch, rgb_images):
+	"""Test that a missing Tesseract binary yields empty text for every image."""
+	def missing(*args, **kwargs):
+		raise TesseractNotFoundError()
+
+	monkeypatch.setattr(ocr_utils.pytesseract, "image_to_string", missing)
+
+	assert ocr_images(rgb_images) == ["", "", ""]
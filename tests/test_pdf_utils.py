@@ -0,0 +1,72 @@
+"""
+Unit tests for PDF utilities.
+"""
+
+import pytest
+
+import app.utils.pdf_utils as pdf_utils
+from app.utils.pdf_utils import extract_pdf_text_per_page
+
+
+def _write_text_pdf(path, num_pages):
+	"""Write a minimal PDF whose page i contains the line 'Page i text'."""
+	font_obj = 3 + 2 * num_pages
+	kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(num_pages))
+	objects = [
+		"<< /Type /Catalog /Pages 2 0 R >>",
+		f"<< /Type /Pages /Kids [{kids}] /Count {num_pages} >>",
+	]
+	for i in range(num_pages):
+		content = f"BT /F1 12 Tf 72 720 Td (Page {i + 1} text) Tj ET"
+		objects.append(
+			f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R"
+			f" /Resources << /Font << /F1 {font_obj} 0 R >> >> >>"
+		)
+		objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+	objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+	data = b"%PDF-1.4\n"
+	offsets = []
+	for num, obj in enumerate(objects, 1):
+		offsets.append(len(data))
+		data += f"{num} 0 obj\n{obj}\nendobj\n".encode()
+	xref = len(data)
+	data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+	data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+	data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+	path.write_bytes(data)
+	return str(path)
+
+
+@pytest.fixture
+def text_pdf(tmp_path):
+	"""A 7-page text PDF (odd, so the last worker range is shorter)."""
+	return _write_text_pdf(tmp_path / "doc.pdf", 7)
+
+
+def test_extract_text_serial(text_pdf, monkeypatch):
+	"""Test serial extraction returns every page in order."""
+	monkeypatch.setattr(pdf_utils, "TEXT_EXTRACT_MAX_WORKERS", 1)
+
+	pages = extract_pdf_text_per_page(text_pdf)
+
+	assert pages == [(i, f"Page {i} text") for i in range(1, 8)]
+
+
+def test_extract_text_parallel_matches_serial(text_pdf, monkeypatch):
+	"""Test the process-pool path returns the same pages, in order, as the serial path."""
+	monkeypatch.setattr(pdf_utils, "TEXT_EXTRACT_MAX_WORKERS", 1)
+	serial = extract_pdf_text_per_page(text_pdf)
+
+	# 7 pages at 2 per worker -> 3 workers over ranges [0,3), [3,6), [6,7)
+	monkeypatch.setattr(pdf_utils, "TEXT_EXTRACT_MAX_WORKERS", 3)
+	monkeypatch.setattr(pdf_utils, "PARALLEL_MIN_PAGES", 2)
+	try:
+		parallel = extract_pdf_text_per_page(text_pdf)
+		# The pool was created by the call above and is kept for later uploads
+		assert pdf_utils._text_pool.cache_info().currsize == 1
+	finally:
+		pdf_utils._text_pool(3).shutdown()
+		pdf_utils._text_pool.cache_clear()
+
+	assert parallel == serial
@@ -2,91 +2,145 @@
 Unit tests for retrieval module.
 """
 
-import unittest
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from app.retrieval import _normalize_scores, _format_source_attribution
-
-
-class TestRetrieval(unittest.TestCase):
-	"""Test cases for retrieval functions."""
-	
-	def test_normalize_scores_empty(self):
-		"""Test score normalization with empty list."""
-		scores = []
-		normalized = _normalize_scores(scores)
-		self.assertEqual(normalized, [])
-		
-	def test_normalize_scores_single(self):
-		"""Test score normalization with single score."""
-		scores = [0.5]
-		normalized = _normalize_scores(scores)
-		self.assertEqual(normalized, [1.0])
-		
-	def test_normalize_scores_range(self):
-		"""Test score normalization with range of scores."""
-		scores = [0.1, 0.5, 0.9]
-		normalized = _normalize_scores(scores)
-		
-		# Check range [0, 1]
-		self.assertAlmostEqual(min(normalized), 0.0, places=5)
-		self.assertAlmostEqual(max(normalized), 1.0, places=5)
-		
-	def test_normalize_scores_identical(self):
-		"""Test score normalization with identical scores."""
-		scores = [0.5, 0.5, 0.5]
-		normalized = _normalize_scores(scores)
-		
-		# All should be 1.0 when identical
-		self.assertTrue(all(s == 1.0 for s in normalized))
-		
-	def test_format_source_attribution_text(self):
-		"""Test source attribution formatting for text."""
-		metadata = {
+import numpy as np
+import pytest
+
+from app.retrieval import (
+	_normalize_scores,
+	_format_source_attribution,
+	_format_generic_attribution,
+	_select_top_k,
+	_SOURCE_FORMATS,
+)
+
+
+@pytest.mark.parametrize("scores,expected", [
+	([], []),
+	([0.5], [1.0]),
+	# Distinct scores: only the endpoints are fixed, checked below
+	([0.1, 0.5, 0.9], None),
+	# All should be 1.0 when identical
+	([0.5, 0.5, 0.5], [1.0, 1.0, 1.0]),
+], ids=["empty", "single", "range", "identical"])
+def test_normalize_scores(scores, expected):
+	"""Test min-max score normalization on representative inputs."""
+	normalized = _normalize_scores(scores)
+
+	if expected is not None:
+		assert normalized == expected
+	else:
+		assert min(normalized) == pytest.approx(0.0, abs=1e-5)
+		assert max(normalized) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_normalize_scores_ndarray():
+	"""Test score normalization accepts numpy arrays and returns floats."""
+	normalized = _normalize_scores(1.0 - np.array([0.2, 0.4, 0.6]))
+
+	assert isinstance(normalized, list)
+	assert isinstance(normalized[0], float)
+	assert normalized[0] == pytest.approx(1.0, abs=1e-5)
+	assert normalized[1] == pytest.approx(0.5, abs=1e-5)
+
+
+def test_select_top_k_across_modalities():
+	"""Test top-k selection over combined text and image scores."""
+	# Combined indices: text 0-2, image 3-4
+	order = _select_top_k([0.2, 1.0, 0.0], [0.9, 0.5], top_k=3)
+
+	assert order.tolist() == [1, 3, 4]
+
+
+def test_select_top_k_ties_prefer_text():
+	"""Test that tied scores keep text results ahead of image results."""
+	order = _select_top_k([1.0], [1.0], top_k=2)
+
+	assert order.tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("metadata,expected_substrings", [
+	(
+		{
 			"file_type": "text",
 			"source_path": "data/uploads/test.txt",
 			"chunk_index": 0,
 			"uploaded_at": "2024-01-01T00:00:00"
-		}
-		
-		attribution = _format_source_attribution(metadata)
-		
-		self.assertIn("test.txt", attribution)
-		self.assertIn("text", attribution)
-		self.assertIn("Chunk: 0", attribution)
-		
-	def test_format_source_attribution_pdf(self):
-		"""Test source attribution formatting for PDF."""
-		metadata = {
+		},
+		["test.txt", "text", "Chunk: 0"],
+	),
+	(
+		{
 			"file_type": "pdf_text",
 			"source_path": "data/uploads/document.pdf",
 			"page": 5,
 			"chunk_index": 2
-		}
-		
-		attribution = _format_source_attribution(metadata)
-		
-		self.assertIn("document.pdf", attribution)
-		self.assertIn("Page: 5", attribution)
-		self.assertIn("Chunk: 2", attribution)
-		
-	def test_format_source_attribution_image(self):
-		"""Test source attribution formatting for image."""
-		metadata = {
+		},
+		["document.pdf", "Page: 5", "Chunk: 2"],
+	),
+	(
+		{
 			"file_type": "image",
 			"source_path": "data/uploads/photo.jpg",
 			"uploaded_at": "2024-01-01T00:00:00"
-		}
-		
-		attribution = _format_source_attribution(metadata)
-		
-		self.assertIn("photo.jpg", attribution)
-		self.assertIn("image", attribution)
+		},
+		["photo.jpg", "image"],
+	),
+	(
+		{
+			"file_type": "pdf_image",
+			"source_path": "data/uploads/document.pdf",
+			"page": 3,
+			"uploaded_at": "2024-01-01T00:00:00"
+		},
+		["document.pdf", "pdf_image", "Page: 3"],
+	),
+], ids=["text", "pdf", "image", "pdf_image"])
+def test_format_source_attribution(metadata, expected_substrings):
+	"""Test source attribution formatting for each file type."""
+	attribution = _format_source_attribution(metadata)
+
+	for expected in expected_substrings:
+		assert expected in attribution
+
+
+# One metadata dict per shape written by app.ingestion
+INGESTION_METADATA = {
+	"text": {
+		"doc_id": "d1", "file_type": "text", "source_path": "data/uploads/a.txt",
+		"chunk_index": 3, "uploaded_at": "2024-01-01T00:00:00",
+	},
+	"pdf_text": {
+		"doc_id": "d2", "file_type": "pdf_text", "source_path": "data/uploads/b.pdf",
+		"uploaded_at": "2024-01-01T00:00:00", "page": 4, "chunk_index": 1,
+	},
+	"image": {
+		"doc_id": "d3", "file_type": "image", "source_path": "data/uploads/c.png",
+		"uploaded_at": "2024-01-01T00:00:00", "ocr_text": "hello",
+	},
+	"pdf_image": {
+		"doc_id": "d4", "file_type": "pdf_image", "source_path": "data/uploads/b.pdf",
+		"uploaded_at": "2024-01-01T00:00:00", "page": 2, "ocr_text": "",
+		"image_path": "data/extracted/d4/page2.png",
+	},
+}
+
+
+def test_source_formats_cover_ingestion_types():
+	"""Test that every dispatch-table entry has an ingestion metadata shape below."""
+	assert set(_SOURCE_FORMATS) == set(INGESTION_METADATA)
+
+
+@pytest.mark.parametrize("file_type", sorted(INGESTION_METADATA))
+def test_source_formats_match_generic(file_type):
+	"""Test that each specialized formatter agrees with the generic formatter."""
+	metadata = INGESTION_METADATA[file_type]
+
+	assert _SOURCE_FORMATS[file_type](metadata) == _format_generic_attribution(metadata)
+
 
+def test_format_source_attribution_missing_fields():
+	"""Test that incomplete or unknown metadata falls back to present fields."""
+	assert _format_source_attribution({}) == "Source: unknown | Type: unknown"
 
-if __name__ == '__main__':
-	unittest.main()
+	attribution = _format_source_attribution({"file_type": "text", "source_path": "notes.txt"})
+	assert attribution == "Source: notes.txt | Type: text"
@@ -2,97 +2,122 @@
 Unit tests for storage module.
 """
 
-import unittest
-import numpy as np
-import sys
-import os
-import shutil
-
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 
 from app.storage import (
 	get_chroma_client,
 	get_collections,
+	get_text_collection,
 	upsert_text,
 	upsert_images,
 	query_text,
 	query_images
 )
 
+# Structural text tests only need a tiny dimension; the image test keeps
+# CLIP's 512 dimensions as a realistic-size smoke check
+TEST_DIM = 8
+
+pytestmark = pytest.mark.usefixtures("fresh_collections")
+
+
+@pytest.fixture
+def text_embs(norm_embs):
+	"""First TEST_DIM columns of the shared matrix (Chroma's cosine space is scale-invariant)."""
+	return norm_embs[:, :TEST_DIM]
+
+
+@pytest.fixture
+def image_embs(norm_embs):
+	"""The shared matrix at CLIP's full 512 dimensions."""
+	return norm_embs
+
+
+def test_get_chroma_client():
+	"""Test ChromaDB client initialization."""
+	client = get_chroma_client()
+	assert client is not None
+
+
+def test_get_collections():
+	"""Test collection retrieval."""
+	text_col, image_col = get_collections()
+	assert text_col is not None
+	assert image_col is not None
+
+
+def test_client_and_collections_cached():
+	"""Test that the client and collections are reused across calls."""
+	assert get_chroma_client() is get_chroma_client()
+	assert get_text_collection() is get_collections()[0]
+
+
+def test_upsert_and_query_text(text_embs):
+	"""Test text upsert and query operations."""
+	embeddings = text_embs[0:2]
+
+	ids = ["test_text_1", "test_text_2"]
+	documents = ["First test document", "Second test document"]
+	metadatas = [
+		{"doc_id": "doc1", "file_type": "text"},
+		{"doc_id": "doc2", "file_type": "text"}
+	]
+
+	# Upsert
+	upsert_text(ids, embeddings, metadatas, documents)
+
+	# Query
+	query_emb = embeddings[0]
+	results = query_text(query_emb, top_k=2)
+
+	assert "ids" in results
+	assert len(results["ids"][0]) > 0
+
+
+def test_query_text_1d_vector(text_embs):
+	"""Test that a 1-D query vector returns its own document first."""
+	embeddings = text_embs[2:5]
+
+	ids = ["test_1d_1", "test_1d_2", "test_1d_3"]
+	documents = ["Alpha", "Beta", "Gamma"]
+	metadatas = [{"doc_id": i, "file_type": "text"} for i in ids]
+	upsert_text(ids, embeddings, metadatas, documents)
+
+	results = query_text(embeddings[1], top_k=1)
+
+	assert embeddings[1].ndim == 1
+	assert results["ids"][0] == ["test_1d_2"]
+
+
+def test_query_text_batch(text_embs):
+	"""Test that several query vectors are answered in one call."""
+	embeddings = text_embs[5:7]
+
+	ids = ["test_batch_1", "test_batch_2"]
+	metadatas = [{"doc_id": i, "file_type": "text"} for i in ids]
+	upsert_text(ids, embeddings, metadatas, ["One", "Two"])
+
+	results = query_text(embeddings, top_k=1)
+
+	assert results["ids"] == [["test_batch_1"], ["test_batch_2"]]
+
+
+def test_upsert_and_query_images(image_embs):
+	"""Test image upsert and query operations."""
+	embeddings = image_embs[0:2]
+
+	ids = ["test_img_1", "test_img_2"]
+	metadatas = [
+		{"doc_id": "img1", "file_type": "image"},
+		{"doc_id": "img2", "file_type": "image"}
+	]
+
+	# Upsert
+	upsert_images(ids, embeddings, metadatas)
+
+	# Query
+	query_emb = embeddings[0]
+	results = query_images(query_emb, top_k=2)
 
-class TestStorage(unittest.TestCase):
-	"""Test cases for storage functions."""
-	
-	@classmethod
-	def setUpClass(cls):
-		"""Set up test database."""
-		# Use a test-specific directory
-		import app.storage as storage
-		storage.CHROMA_PERSIST_DIR = "data/chroma_test"
-		
-	@classmethod
-	def tearDownClass(cls):
-		"""Clean up test database."""
-		if os.path.exists("data/chroma_test"):
-			shutil.rmtree("data/chroma_test")
-			
-	def test_get_chroma_client(self):
-		"""Test ChromaDB client initialization."""
-		client = get_chroma_client()
-		self.assertIsNotNone(client)
-		
-	def test_get_collections(self):
-		"""Test collection retrieval."""
-		text_col, image_col = get_collections()
-		self.assertIsNotNone(text_col)
-		self.assertIsNotNone(image_col)
-		
-	def test_upsert_and_query_text(self):
-		"""Test text upsert and query operations."""
-		# Create test embeddings
-		embeddings = np.random.rand(2, 384).astype(np.float32)
-		embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
-		
-		ids = ["test_text_1", "test_text_2"]
-		documents = ["First test document", "Second test document"]
-		metadatas = [
-			{"doc_id": "doc1", "file_type": "text"},
-			{"doc_id": "doc2", "file_type": "text"}
-		]
-		
-		# Upsert
-		upsert_text(ids, embeddings, metadatas, documents)
-		
-		# Query
-		query_emb = embeddings[0]
-		results = query_text(query_emb, top_k=2)
-		
-		self.assertIn("ids", results)
-		self.assertGreater(len(results["ids"][0]), 0)
-		
-	def test_upsert_and_query_images(self):
-		"""Test image upsert and query operations."""
-		# Create test embeddings
-		embeddings = np.random.rand(2, 512).astype(np.float32)
-		embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
-		
-		ids = ["test_img_1", "test_img_2"]
-		metadatas = [
-			{"doc_id": "img1", "file_type": "image"},
-			{"doc_id": "img2", "file_type": "image"}
-		]
-		
-		# Upsert
-		upsert_images(ids, embeddings, metadatas)
-		
-		# Query
-		query_emb = embeddings[0]
-		results = query_images(query_emb, top_k=2)
-		
-		self.assertIn("ids", results)
-		self.assertGreater(len(results["ids"][0]), 0)
-
-
-if __name__ == '__main__':
-	unittest.main()
+	assert "ids" in results
+	assert len(results["ids"][0]) > 0
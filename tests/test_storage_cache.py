@@ -0,0 +1,39 @@
+"""
+Unit tests for the real (unpatched) ChromaDB client and collection caches.
+
+test_storage.py swaps in an in-memory client for speed; these tests keep the
+production lru_cache path honest against a temporary persist directory.
+"""
+
+import pytest
+
+import app.storage as storage
+
+
+@pytest.fixture
+def tmp_persist_dir(tmp_path, monkeypatch):
+	"""Point storage at an empty persist dir with cold client/collection caches."""
+	storage._client_for.cache_clear()
+	storage._collection_for.cache_clear()
+	monkeypatch.setattr(storage, "CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+	yield storage.CHROMA_PERSIST_DIR
+	storage._collection_for.cache_clear()
+	storage._client_for.cache_clear()
+
+
+def test_client_cached_per_persist_dir(tmp_persist_dir):
+	"""Test that the real cached client factory returns one client per directory."""
+	client = storage.get_chroma_client()
+
+	assert storage.get_chroma_client() is client
+	assert storage._client_for(tmp_persist_dir) is client
+	assert storage._client_for.cache_info().misses == 1
+
+
+def test_collections_cached(tmp_persist_dir):
+	"""Test that collection handles are created once and then reused."""
+	text_col, image_col = storage.get_collections()
+
+	assert storage.get_text_collection() is text_col
+	assert storage.get_image_collection() is image_col
+	assert storage._collection_for.cache_info().misses == 2